@@ -23,11 +23,12 @@ SOFTWARE.
 """
 
 import asyncio
+import sys
+from collections import defaultdict
 from collections.abc import Sequence
+from types import MappingProxyType
 from typing import Any
 
-import frozendict
-
 from .coro_func import CoroFunc
 
 __all__: Sequence[str] = ('Dispatch')
@@ -38,13 +39,22 @@ class Dispatch:
     Utility for dispatching raw event data.
 
     .. note::
-        Events dispatched are dispatched as frozen dictionaries.
-        This means that they are immutable and cannot be globally mutated.
+        Events are dispatched as read-only views of the payload.
+        This means that they cannot be globally mutated, though nested
+        values are the payload's own objects and are not copied.
         To make them mutable, you should convert it back to a normalized dictionary.
+
+    .. note::
+        When an event has multiple handlers,
+        they are run in an :class:`asyncio.TaskGroup`.
+        If one of them raises, the other handlers for that event are cancelled
+        and the errors are raised in an :class:`ExceptionGroup`.
+        Handlers only start eagerly if the running loop uses
+        :func:`asyncio.eager_task_factory`.
     """
 
     def __init__(self) -> None:
-        self._events: dict[str, list[CoroFunc]] = {}
+        self._events: defaultdict[str, list[CoroFunc]] = defaultdict(list)
 
 
     def add_call(self, invoker: str, caller: CoroFunc) -> None:
@@ -58,10 +68,7 @@ class Dispatch:
         caller: :class:`.coro_func.CoroFunc`
             The asynchronous function to be called by `invoker`.
         """
-        try:
-            self._events[invoker].append(caller)
-        except KeyError:
-            self._events[invoker] = [caller]
+        self._events[sys.intern(invoker)].append(caller)
 
 
     def remove_call(self, invoker: str, caller: CoroFunc) -> None:
@@ -75,7 +82,12 @@ class Dispatch:
         caller: :class:`.coro_func.CoroFunc`
             The asynchronous function to be called by `invoker`.
         """
-        self._events[invoker].remove(caller)
+        callers = self._events.get(invoker)
+
+        if callers is None:
+            raise KeyError(invoker)
+
+        callers.remove(caller)
 
 
     async def call(self, type: str, data: dict[str, Any]) -> None:
@@ -91,16 +103,17 @@ class Dispatch:
         """
         callers = self._events.get(type)
 
-        if callers is None:
+        if not callers:
             return
 
-        # mypy thinks the frozendict class is a module for some reason,
-        frozen = frozendict.frozendict(data) # type: ignore[operator]
+        view = MappingProxyType(data)
 
-        # gather tasks them run them concurrently
-        tasks = []
-
-        for caller in callers:
-            tasks.append(caller(frozen))
+        # the common case, no need to schedule anything
+        if len(callers) == 1:
+            await callers[0](view)
+            return
 
-        await asyncio.gather(*tasks)
+        # run them concurrently
+        async with asyncio.TaskGroup() as tg:
+            for caller in callers:
+                tg.create_task(caller(view))
@@ -24,6 +24,7 @@ SOFTWARE.
 
 
 import asyncio
+import itertools
 import logging
 import zlib
 from platform import system
@@ -39,14 +40,61 @@ from bls_utils.exceptions import ShardError
 from .shard_rate_limiter import RateLimiter
 
 _log = logging.getLogger(__name__)
+_decoder = msgspec.json.Decoder(dict[str, Any])
+_encoder = msgspec.json.Encoder()
+_OS = system()
+
+
+class Heartbeat(msgspec.Struct):
+    op: int = 1
+    d: int | None = None
+
+
+class IdentifyProperties(msgspec.Struct):
+    os: str
+    browser: str
+    device: str
+
+
+class IdentifyData(msgspec.Struct):
+    token: str
+    properties: IdentifyProperties
+    compress: bool
+    large_threshold: int
+    intents: int
+    shard: tuple[int, int]
+
+
+class Identify(msgspec.Struct):
+    d: IdentifyData
+    op: int = 2
+
+
+class ResumeData(msgspec.Struct):
+    token: str
+    session_id: str | None
+    seq: int | None
+
+
+class Resume(msgspec.Struct):
+    d: ResumeData
+    op: int = 6
 
 
 class Inflation:
     def __init__(self) -> None:
         self.inflator = zlib.decompressobj()
+        self.buffer = bytearray()
+        self.used = False
 
     def reset(self) -> None:
-        self.inflator = zlib.decompressobj()
+        # every connection is its own zlib stream, so a used inflator
+        # can't be carried over, but an untouched one can.
+        if self.used:
+            self.inflator = zlib.decompressobj()
+            self.used = False
+
+        self.buffer.clear()
 
 
 class Shard:
@@ -79,11 +127,17 @@ class Shard:
         The Gateway URL to use for this shard. Defaults to `wss://gateway.discord.gg`.
     version: :class:`int`
         The Discord API version to use. Defaults to 10.
+    identify_limiter: :class:`.shard_rate_limiter.RateLimiter`
+        Rate limiter shared by every shard to space out identifies.
+        Should allow `max_concurrency` identifies every 5 seconds.
+        Defaults to one only used by this shard.
     """
 
     ZLIB_SUFFIX = b'\x00\x00\xff\xff'
+    # compressed frames larger than this are inflated in a thread.
+    INFLATE_THRESHOLD = 65536
     FMT_URL = '{base}/?v={version}&encoding=json&compress=zlib-stream'
-    RESUMABLE: list[int] = [
+    RESUMABLE: frozenset[int] = frozenset({
         4000,
         4001,
         4002,
@@ -92,7 +146,8 @@ class Shard:
         4007,
         4008,
         4009,
-    ]
+    })
+    UNRECOVERABLE: frozenset[int] = frozenset({4004, 4011, 4014})
 
     def __init__(
         self,
@@ -108,7 +163,8 @@ class Shard:
         shard_id: int = 0,
         shard_count: int = 0,
         base_url: str = 'wss://gateway.discord.gg',
-        version: int = 10
+        version: int = 10,
+        identify_limiter: RateLimiter | None = None
     ) -> None:
 
         self.url = self.FMT_URL.format(base=base_url, version=version)
@@ -124,11 +180,22 @@ class Shard:
         self.__proxy_url = proxy_url
         self.__proxy_auth = proxy_auth
         self._rate_limiter = RateLimiter(110, 60)
+        self._identify_limiter = identify_limiter or RateLimiter(1, 5)
+        self._closing = False
+        self.__hb_task: asyncio.Task[None] | None = None
+        self.__hb_received: asyncio.Future[None] | None = None
         self.library = library
         self._large_threshold = large_threshold
         self._intents = intents
         self.session_id: str | None = None
         self.__dispatcher = dispatcher
+        self._last_hb_seq: int | None = None
+        self._last_hb_bytes: bytes = _encoder.encode(Heartbeat())
+        self._properties = IdentifyProperties(
+            os=_OS,
+            browser=library,
+            device=library
+        )
 
 
     async def connect(self, reconnect: bool = False) -> None:
@@ -140,28 +207,52 @@ class Shard:
         reconnect: :class:`bool`
             Whether this should reconnect or connect. Defaults to False.
         """
-        if self._ws:
+        self._closing = False
+        await self._connect(reconnect=reconnect)
+
+
+    async def _reconnect(self, reconnect: bool = False) -> None:
+        # closed by the user, don't come back
+        if self._closing:
+            return
+
+        await self._connect(reconnect=reconnect)
+
+
+    async def _connect(self, reconnect: bool = False) -> None:
+        if self._ws and not self._ws.closed:
             raise ShardError('WebSocket already exists')
 
-        self._financed_hello: asyncio.Future[None] = asyncio.Future()
-        self.inf.reset()
+        await self._stop_heartbeat()
 
         if self._reconnect_base and reconnect:
             url = self.FMT_URL.format(base=self._reconnect_base, version=self.version)
         else:
             url  = self.url
 
-        try:
-            self._ws = await self._session.ws_connect(
-                url,
-                proxy=self.__proxy_url,
-                proxy_auth=self.__proxy_auth
-            )
-        except(aiohttp.ClientConnectionError, aiohttp.ClientConnectorError):
-            # TODO: replace with an exponential backoff.
-            await asyncio.sleep(10)
-            await self.connect(reconnect=reconnect)
-            return
+        for attempt in itertools.count():
+            # closed while waiting to retry
+            if self._closing:
+                return
+
+            self._financed_hello: asyncio.Future[None] = asyncio.Future()
+            self.inf.reset()
+
+            try:
+                self._ws = await self._session.ws_connect(
+                    url,
+                    proxy=self.__proxy_url,
+                    proxy_auth=self.__proxy_auth
+                )
+                break
+            except(aiohttp.ClientConnectionError, aiohttp.ClientConnectorError):
+                # capped before going float, 2 ** 1024 doesn't fit in one.
+                step = min(attempt, 6)
+                delay = min(60, 2 ** step + random() * step) # noqa: S311
+                _log.debug(
+                    'shard %s failed to connect, retrying in %.2fs', self.id, delay
+                )
+                await asyncio.sleep(delay)
 
         self.__receive_task = asyncio.create_task(self.__receive())
 
@@ -177,166 +268,240 @@ class Shard:
         if self._ws is None:
             raise ShardError('WebSocket must exist to receive from it')
 
+        # this is the per-event loop, so keep everything it touches local.
+        closed = aiohttp.WSMsgType.CLOSED
+        binary = aiohttp.WSMsgType.BINARY
+        text = aiohttp.WSMsgType.TEXT
+        suffix = self.ZLIB_SUFFIX
+        buffer = self.inf.buffer
+        inflate = self.inf.inflator.decompress
+        self.inf.used = True
+        threshold = self.INFLATE_THRESHOLD
+        run_in_executor = asyncio.get_running_loop().run_in_executor
+        decode = _decoder.decode
+        handle = self.__handle
+        ws = self._ws
+
         async for message in self._ws:
-            if message.type == aiohttp.WSMsgType.CLOSED:
+            mtype = message.type
+
+            if mtype == closed:
                 break
-            elif message.type == aiohttp.WSMsgType.BINARY:
-                # invalid message
-                if len(message.data) < 4 or message.data[-4:] != self.ZLIB_SUFFIX:
+            elif mtype == text:
+                # not compressed, nothing to inflate
+                data: dict[str, Any] = decode(message.data)
+            elif mtype == binary:
+                # partial message, wait for the rest of it
+                if not message.data.endswith(suffix):
+                    buffer.extend(message.data)
                     continue
 
+                if buffer:
+                    buffer.extend(message.data)
+                    payload = bytes(buffer)
+                    buffer.clear()
+                else:
+                    payload = message.data
+
+                # frames are handled one at a time here,
+                # so the inflator never has two payloads in flight.
                 try:
-                    text_content = self.inf.inflator.decompress(message.data) \
-                        .decode('utf-8')
+                    if len(payload) > threshold:
+                        raw = await run_in_executor(None, inflate, payload)
+                    else:
+                        raw = inflate(payload)
                 except zlib.error:
                     continue
 
-                data: dict[str, Any] = msgspec.json.decode(
-                    text_content,
-                    type=dict[str, Any]
-                )
+                data = decode(raw)
+            else:
+                continue
 
-                self._sequence = data.get('s')
-
-                op: int = data['op']
-                d: dict[str, Any] | int | None = data['d']
-                t: str | None = data.get('t')
-
-                match op:
-                    case 0:
-                        d = cast(dict[str, Any], d)
-                        t = cast(str, t)
-                        if t == 'READY':
-                            self.session_id = d['session_id']
-                            self._reconnect_base = d['resume_gateway_url']
-                        asyncio.create_task(self.__dispatcher.call(t, d))
-                    case 1:
-                        await self._ws.send_bytes(
-                            msgspec.json.encode(
-                                {
-                                    'op': 1,
-                                    'd': self._sequence
-                                }
-                            )
-                        )
-                    case 7:
-                        await self._ws.close(code=1002)
-                        await self.connect(reconnect=True)
-                        return
-                    case 9:
-                        await self._ws.close()
-                        await self.connect()
-                        return
-                    case 10:
-                        d = cast(dict[str, Any], d)
-
-                        self._heartbeat_interval: int = d['heartbeat_interval'] / 1000
-
-                        self.__hb_task = asyncio.create_task(
-                            self.__heartbeat_handler(
-                                jitter=True
-                            )
-                        )
-                        self._financed_hello.set_result(None)
-                    case 11:
-                        if not self.__hb_received.done():
-                            self.__hb_received.set_result(None)
-
-                            self.__hb_task = asyncio.create_task(
-                                self.__heartbeat_handler()
-                            )
+            # the connection was replaced while handling this payload
+            if await handle(ws, data):
+                return
 
         await self.handle_close(self._ws.close_code)
 
+
+    async def __handle(
+        self,
+        ws: aiohttp.ClientWebSocketResponse,
+        data: dict[str, Any]
+    ) -> bool:
+        # returns whether this connection was replaced and receiving should stop.
+
+        self._sequence = data.get('s')
+
+        op: int = data['op']
+        d: dict[str, Any] | int | None = data['d']
+        t: str | None = data.get('t')
+
+        match op:
+            case 0:
+                d = cast(dict[str, Any], d)
+                t = cast(str, t)
+                if t == 'READY':
+                    self.session_id = d['session_id']
+                    self._reconnect_base = d['resume_gateway_url']
+                asyncio.create_task(self.__dispatcher.call(t, d))
+            case 1:
+                await ws.send_bytes(self._heartbeat_payload())
+            case 7:
+                await ws.close(code=1002)
+                await self._reconnect(reconnect=True)
+                return True
+            case 9:
+                await ws.close()
+                await self._reconnect()
+                return True
+            case 10:
+                d = cast(dict[str, Any], d)
+
+                self._heartbeat_interval: int = d['heartbeat_interval'] / 1000
+
+                self.__hb_task = asyncio.create_task(self.__heartbeat_loop())
+                self._financed_hello.set_result(None)
+            case 11:
+                received = self.__hb_received
+
+                if received is not None and not received.done():
+                    received.set_result(None)
+
+        return False
+
+
     async def close(self) -> None:
         """Close this Shard's websocket."""
+        self._closing = True
+
+        await self._stop_heartbeat()
+
         if self._ws:
             await self._ws.close()
 
 
-    async def send(self, data: dict[str, Any]) -> None:
+    async def send(self, data: dict[str, Any] | msgspec.Struct) -> None:
         """
         Send a message to this Shard's websocket.
 
         Parameters
         ----------
-        data: :class:`dict`[:class:`str`, :class:`Any`]
+        data: :class:`dict`[:class:`str`, :class:`Any`] | :class:`msgspec.Struct`
             The data to send to Discord.
         """
-        if self._ws is None:
-            raise ShardError('WebSocket must exist to send to it')
+        if self._ws is None or self._ws.closed:
+            raise ShardError('WebSocket must be open to send to it')
 
         async with self._rate_limiter:
-            await self._ws.send_bytes(msgspec.json.encode(data))
+            await self._ws.send_bytes(_encoder.encode(data))
 
 
     async def identify(self) -> None:
         """Identify to the Discord Gateway."""
-        await self.send({
-            'op': 2,
-            'd': {
-                'token': self.__token,
-                'properties': {
-                    'os': system(),
-                    'browser': self.library,
-                    'device': self.library
-                },
-                'compress': True,
-                'large_threshold': int(self._large_threshold),
-                'intents': int(self._intents),
-                'shard': [self.id, self.count]
-            }
-        })
+        if self._ws is None or self._ws.closed:
+            raise ShardError('WebSocket must be open to send to it')
+
+        payload = _encoder.encode(
+            Identify(
+                d=IdentifyData(
+                    token=self.__token,
+                    properties=self._properties,
+                    compress=True,
+                    large_threshold=int(self._large_threshold),
+                    intents=int(self._intents),
+                    shard=(self.id, self.count)
+                )
+            )
+        )
+
+        # wait on this shard's own limit first, so the shared identify
+        # bucket is only spent right as the identify is written.
+        async with self._rate_limiter, self._identify_limiter:
+            await self._ws.send_bytes(payload)
 
 
     async def resume(self) -> None:
         """Resume a previously closed connection."""
-        await self.send({
-            'op': 6,
-            'd': {
-                'token': self.__token,
-                'session_id': self.session_id,
-                'seq': self._sequence
-            }
-        })
+        await self.send(
+            Resume(
+                d=ResumeData(
+                    token=self.__token,
+                    session_id=self.session_id,
+                    seq=self._sequence
+                )
+            )
+        )
+
+
+    def _heartbeat_payload(self) -> bytes:
+        seq = self._sequence
 
+        # the sequence often hasn't moved since the last heartbeat
+        if seq != self._last_hb_seq:
+            self._last_hb_bytes = _encoder.encode(Heartbeat(d=seq))
+            self._last_hb_seq = seq
 
-    async def __heartbeat_handler(self, jitter: bool = False) -> None:
+        return self._last_hb_bytes
+
+
+    async def __heartbeat_loop(self) -> None:
         if self._ws is None:
             return
 
-        if jitter:
-            await asyncio.sleep(self._heartbeat_interval * random()) # noqa: S311
-        else:
-            await asyncio.sleep(self._heartbeat_interval)
+        ws: aiohttp.ClientWebSocketResponse = self._ws
 
-        self.__hb_received: asyncio.Future[None] = asyncio.Future()
+        jitter = True
 
-        try:
-            await self._ws.send_bytes(
-                msgspec.json.encode(
-                    {
-                        'op': 1,
-                        'd': self._sequence
-                    }
-                )
-            )
-        except ConnectionResetError:
-            self.__receive_task.cancel()
-            if not self._ws.closed:
-                await self._ws.close(code=1008)
-            await self.connect(reconnect=bool(self._reconnect_base))
+        while True:
+            if jitter:
+                await asyncio.sleep(self._heartbeat_interval * random()) # noqa: S311
+                jitter = False
+            else:
+                await asyncio.sleep(self._heartbeat_interval)
+
+            # a new connection will have started its own loop
+            if ws.closed:
+                return
+
+            # owned by this loop, so a newer connection can't replace it
+            received: asyncio.Future[None] = asyncio.Future()
+            self.__hb_received = received
+
+            try:
+                await ws.send_bytes(self._heartbeat_payload())
+                await asyncio.wait_for(received, 5)
+            except (ConnectionResetError, TimeoutError):
+                # the connection was already replaced
+                if self._ws is not ws:
+                    return
+
+                self.__receive_task.cancel()
+
+                if not ws.closed:
+                    await ws.close(code=1008)
+
+                await self._reconnect(reconnect=bool(self._reconnect_base))
+                return
+
+
+    async def _stop_heartbeat(self) -> None:
+        task = self.__hb_task
+
+        # the heartbeat loop reconnects through `connect` itself
+        if task is None or task.done() or task is asyncio.current_task():
             return
 
-        try:
-            await asyncio.wait_for(self.__hb_received, 5)
-        except asyncio.TimeoutError:
-            self.__receive_task.cancel()
+        task.cancel()
 
-            if not self._ws.closed:
-                await self._ws.close(code=1008)
+        try:
+            await task
+        except asyncio.CancelledError:
+            current = asyncio.current_task()
 
-            await self.connect(reconnect=bool(self._reconnect_base))
+            # only swallow the heartbeat's cancellation, not our own
+            if current is not None and current.cancelling():
+                raise
 
 
     async def handle_close(self, code: int | None = None) -> None:
@@ -348,18 +513,19 @@ class Shard:
         code: :class:`int` | None
             The code to handle. Defaults to None.
         """
-        if self.__hb_task and not self.__hb_task.done():
-            self.__hb_task.cancel()
-
-        if code is None: # noqa: SIM114
-            await self.connect(reconnect=True)
-        elif code in self.RESUMABLE:
-            await self.connect(reconnect=True)
-        elif code > 4000 or code == 4000:
-            await self.connect()
-        elif code in (4004, 4011, 4014):
+        await self._stop_heartbeat()
+
+        # closed by the user, don't come back
+        if self._closing:
+            return
+
+        if code is None or code in self.RESUMABLE:
+            await self._reconnect(reconnect=True)
+        elif code in self.UNRECOVERABLE:
             raise ShardError(f'Code: {code} received. Cannot recover from this code.')
+        elif code >= 4000:
+            await self._reconnect()
         else:
             # connection may have been killed
-            await self.connect(reconnect=True)
+            await self._reconnect(reconnect=True)
 
@@ -22,51 +22,40 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 import asyncio
-import time
 from typing import Any
 
 
 class RateLimiter:
+    """
+    Token bucket allowing `concurrency` acquisitions every `per` seconds.
+
+    Credit is refilled from the time elapsed since the last acquisition,
+    so no timers are scheduled while under the limit.
+    """
+
     def __init__(self, concurrency: int, per: float | int) -> None:
         self.concurrency: int = concurrency
         self.per: float | int = per
+        self.rate: float = concurrency / per
 
-        self.current: int = self.concurrency
-        self._reserved: list[asyncio.Future[None]] = []
         self.loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
-        self.pending_reset: bool = False
+        self.tokens: float = float(concurrency)
+        self.last: float = self.loop.time()
 
     async def __aenter__(self) -> 'RateLimiter':
-        while self.current == 0:
-            future = self.loop.create_future()
-            self._reserved.append(future)
-            await future
+        while True:
+            now = self.loop.time()
+            self.tokens = min(
+                self.concurrency,
+                self.tokens + (now - self.last) * self.rate
+            )
+            self.last = now
 
-        self.current -= 1
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return self
 
-        if not self.pending_reset:
-            self.pending_reset = True
-            self.loop.call_later(self.per, self.reset)
-
-        return self
+            await asyncio.sleep((1 - self.tokens) / self.rate)
 
     async def __aexit__(self, *_: Any) -> None:
         ...
-
-    def reset(self) -> None:
-        current_time = time.time()
-        self.reset_at = current_time + self.per
-        self.current = self.concurrency
-
-        for _ in range(self.concurrency):
-            try:
-                self._reserved.pop().set_result(None)
-            except IndexError:
-                break
-
-        if len(self._reserved):
-            self.pending_reset = True
-            self.loop.call_later(self.per, self.reset)
-        else:
-            self.pending_reset = False
-
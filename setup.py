@@ -35,7 +35,9 @@ packages = [
 ]
 
 # this is for documentation
-extra_requires: dict[str, list[str]] = {}
+extra_requires: dict[str, list[str]] = {
+    'speed': ['uvloop>=0.17.0; sys_platform != "win32"'],
+}
 
 setuptools.setup(
     name='bull',
@@ -54,15 +56,15 @@ setuptools.setup(
     install_requires=requirements,
     extras_require=extra_requires,
     description='Ecosystem of bundled packages for creating Discord libraries.',
-    python_requires='>=3.10',
+    python_requires='>=3.11',
     classifiers=[
         'Development Status :: 2 - Pre-Alpha',
         'License :: OSI Approved :: MIT License',
         'Intended Audience :: Developers',
         'Natural Language :: English',
         'Operating System :: OS Independent',
+        'Programming Language :: Python :: 3.12',
         'Programming Language :: Python :: 3.11',
-        'Programming Language :: Python :: 3.10',
         'Programming Language :: Python :: Implementation :: CPython',
         'Framework :: AsyncIO',
         'Framework :: aiohttp',